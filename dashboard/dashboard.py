@@ -1,18 +1,222 @@
 #!/usr/bin/env python3
 
+import glob
+import gzip
+import hashlib
 import json
 import os
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+import threading
+import time
+from collections import deque
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 from datetime import datetime
+from urllib.parse import urlparse, parse_qs
 
-class DashboardHandler(SimpleHTTPRequestHandler):
-    def do_GET(self):
-        if self.path == '/':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            
-            html = '''<!DOCTYPE html>
+ALERTS_FILE = '/app/logs/honeypot_alerts.json'
+# Tells the page to clear its alert list before a full replay (events without data are not dispatched)
+RESET_FRAME = b'event: reset\ndata: {}\n\n'
+
+def tail_lines(path, count, block_size=65536):
+    """Return the last count lines of a file without reading all of it"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b''
+        while pos > 0 and data.count(b'\n') <= count:
+            read_size = min(block_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            data = f.read(read_size) + data
+    lines = data.splitlines()
+    if pos > 0:
+        lines = lines[1:]
+    return lines[-count:]
+
+def parse_lines(lines):
+    alerts = []
+    for line in lines:
+        try:
+            alerts.append(json.loads(line))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+    return alerts
+
+def read_recent_alerts(alerts_file, count):
+    """Last count alerts from the active file, then from rotated segments (newest first) if needed"""
+    alerts = parse_lines(tail_lines(alerts_file, count)) if os.path.exists(alerts_file) else []
+    stem = os.path.splitext(alerts_file)[0]
+    for index_file in sorted(glob.glob(stem + '.*.idx'), reverse=True):
+        if len(alerts) >= count:
+            break
+        with open(index_file, 'r') as f:
+            segment = os.path.join(os.path.dirname(alerts_file), json.load(f)['segment'])
+        plain = segment[:-3] if segment.endswith('.gz') else segment
+        for candidate in (plain + '.gz', plain):
+            if os.path.exists(candidate):
+                opener = gzip.open if candidate.endswith('.gz') else open
+                with opener(candidate, 'rb') as f:
+                    alerts = parse_lines(f.read().splitlines())[-(count - len(alerts)):] + alerts
+                break
+    return alerts[-count:]
+
+class AlertFeed:
+    """Follows the alerts file and keeps recent alerts as numbered SSE events
+
+    One thread tails the file (reopening it after rotation) and appends each
+    new alert to a bounded buffer; stream handlers wait on a condition for
+    events newer than their cursor. A client that falls further behind than
+    the buffer holds is disconnected and resumes via Last-Event-ID.
+    """
+
+    def __init__(self, path, buffer_size=500, poll_interval=1.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.events = deque(maxlen=buffer_size)
+        self.last_id = 0
+        self.epoch = int(time.time())
+        self.cond = threading.Condition()
+
+    def _append(self, alert):
+        alert_id = alert.get('alert_id')
+        event_id = max(alert_id if isinstance(alert_id, int) else 0, self.last_id + 1)
+        self.last_id = event_id
+        self.events.append((event_id, f"id: {event_id}\ndata: {json.dumps(alert)}\n\n".encode('utf-8'), alert))
+
+    def events_after(self, event_id, backlog=0):
+        """(id, frame, alert) events newer than event_id, or the last backlog ones when event_id is None
+
+        Returns None when events after event_id have already been evicted, or when
+        event_id is ahead of the feed (the dashboard restarted and ids began again).
+        """
+        with self.cond:
+            if event_id is None:
+                return list(self.events)[-backlog:] if backlog > 0 else []
+            if event_id > self.last_id:
+                return None
+            if self.events and self.events[0][0] > event_id + 1 and event_id < self.last_id:
+                return None
+            return [event for event in self.events if event[0] > event_id]
+
+    def since(self, event_id, limit):
+        """(last id, up to limit alerts newer than event_id); everything for a missing or stale cursor"""
+        with self.cond:
+            if event_id is None or event_id > self.last_id:
+                event_id = 0
+            return self.last_id, [alert for i, _, alert in self.events if i > event_id][-limit:]
+
+    def wait(self, event_id, timeout):
+        """Block until an event newer than event_id exists or timeout elapses"""
+        with self.cond:
+            self.cond.wait_for(lambda: self.last_id > event_id, timeout)
+            return self.last_id
+
+    def start(self):
+        """Load the recent backlog, then follow the file from its current end"""
+        f = self._open(seek_end=True)
+        try:
+            seed = read_recent_alerts(self.path, self.events.maxlen)
+        except Exception as e:
+            print(f"Error reading alerts file: {e}")
+            seed = []
+        with self.cond:
+            for alert in seed:
+                self._append(alert)
+
+        threading.Thread(target=self._follow, args=(f,), daemon=True).start()
+        return self
+
+    def _open(self, seek_end):
+        try:
+            f = open(self.path, 'rb')
+        except OSError:
+            return None
+        if seek_end:
+            f.seek(0, os.SEEK_END)
+        return f
+
+    def _read_new(self, f, partial):
+        data = partial + f.read()
+        lines = data.split(b'\n')
+        alerts = parse_lines(line for line in lines[:-1] if line.strip())
+        if alerts:
+            with self.cond:
+                for alert in alerts:
+                    self._append(alert)
+                self.cond.notify_all()
+        return lines[-1]
+
+    def _follow(self, f):
+        partial = b''
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                if f is None:
+                    f = self._open(seek_end=False)
+                    continue
+                partial = self._read_new(f, partial)
+                # Rotated: finish the old file above, then switch to the new one
+                if not os.path.exists(self.path) or os.stat(self.path).st_ino != os.fstat(f.fileno()).st_ino:
+                    f.close()
+                    f = self._open(seek_end=False)
+                    partial = b''
+            except OSError as e:
+                print(f"Error following alerts file: {e}")
+
+def accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header allows gzip (q=0 refuses it)"""
+    if not accept_encoding:
+        return False
+    wildcard = False
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding in ('gzip', 'x-gzip'):
+            return quality > 0
+        if coding == '*':
+            wildcard = quality > 0
+    return wildcard
+
+class RenderedPage:
+    """A static page encoded once at startup, kept as identity and gzip bodies with ETags"""
+
+    def __init__(self, text, content_type='text/html; charset=utf-8', cache_control='no-cache'):
+        self.content_type = content_type
+        # no-cache: browsers keep the page but revalidate it, getting a bodyless 304 when unchanged
+        self.cache_control = cache_control
+        self.identity = text.encode('utf-8')
+        self.gzip = gzip.compress(self.identity, compresslevel=9, mtime=0)
+        digest = hashlib.blake2b(self.identity, digest_size=8).hexdigest()
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+
+    def variant(self, gzipped):
+        """(body, ETag) of the requested encoding"""
+        if gzipped:
+            return self.gzip, self.gzip_etag
+        return self.identity, self.etag
+
+    def matches(self, if_none_match):
+        """Whether If-None-Match names either variant (weak comparison)"""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if tag == '*':
+                return True
+            if tag.startswith('W/'):
+                tag = tag[2:]
+            if tag in (self.etag, self.gzip_etag):
+                return True
+        return False
+
+DASHBOARD_HTML = '''<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
@@ -61,93 +265,265 @@ class DashboardHandler(SimpleHTTPRequestHandler):
     </div>
 
     <script>
+        const MAX_ALERTS = 100;
+        const alerts = [];
+        const userCounts = new Map();
+        const tableCounts = new Map();
+        let pendingAlerts = [];
+        let renderPending = false;
+        let alertsCursor = 0;
+        let alertsETag = null;
+        
+        function bump(counts, key, delta) {
+            const n = (counts.get(key) || 0) + delta;
+            if (n > 0) {
+                counts.set(key, n);
+            } else {
+                counts.delete(key);
+            }
+        }
+        
+        function alertHtml(alert) {
+            return '<div class="alert">' +
+                '<strong>🚨 Honeypot Table Accessed!</strong><br>' +
+                '<strong>Table:</strong> ' + (alert.table || 'unknown') + '<br>' +
+                '<strong>User:</strong> ' + (alert.user || 'unknown') + '<br>' +
+                '<strong>Client IP:</strong> ' + (alert.client_ip || 'unknown') + '<br>' +
+                '<strong>Message:</strong> ' + (alert.alert || 'Honeypot table accessed') +
+                '<div class="timestamp">⏰ ' + (alert.timestamp || 'unknown time') + '</div>' +
+            '</div>';
+        }
+        
+        function renderAlerts() {
+            // Only the new alerts are parsed into the DOM; evicted ones are removed from the bottom
+            renderPending = false;
+            const alertsContainer = document.getElementById('alerts');
+            const fresh = pendingAlerts.slice(-MAX_ALERTS);
+            pendingAlerts = [];
+            
+            if (fresh.length > 0) {
+                if (alerts.length === 0) {
+                    alertsContainer.innerHTML = '';
+                }
+                fresh.forEach(alert => {
+                    alerts.push(alert);
+                    bump(userCounts, alert.user, 1);
+                    bump(tableCounts, alert.table, 1);
+                });
+                alertsContainer.insertAdjacentHTML('afterbegin', fresh.slice().reverse().map(alertHtml).join(''));
+                
+                while (alerts.length > MAX_ALERTS) {
+                    const old = alerts.shift();
+                    bump(userCounts, old.user, -1);
+                    bump(tableCounts, old.table, -1);
+                    alertsContainer.lastElementChild.remove();
+                }
+            }
+            
+            if (alerts.length === 0) {
+                alertsContainer.innerHTML = '<div class="no-alerts">No alerts yet. When honeypot tables are accessed, alerts will appear here.</div>';
+            }
+            
+            // Update statistics
+            document.getElementById('total-alerts').textContent = alerts.length;
+            document.getElementById('unique-users').textContent = userCounts.size;
+            document.getElementById('unique-tables').textContent = tableCounts.size;
+        }
+        
+        function resetAlerts() {
+            alerts.length = 0;
+            pendingAlerts = [];
+            userCounts.clear();
+            tableCounts.clear();
+            alertsCursor = 0;
+            document.getElementById('alerts').innerHTML = '';
+        }
+        
+        function addAlerts(list, cursor) {
+            if (cursor) {
+                alertsCursor = Math.max(alertsCursor, cursor);
+            }
+            if (list.length === 0) {
+                return;
+            }
+            pendingAlerts.push(...list);
+            // Coalesce bursts (e.g. the initial backlog) into one render per frame
+            if (!renderPending) {
+                renderPending = true;
+                requestAnimationFrame(renderAlerts);
+            }
+        }
+        
         function loadAlerts() {
-            fetch('/api/alerts')
-                .then(r => r.json())
-                .then(data => {
-                    const alertsContainer = document.getElementById('alerts');
-                    const totalAlerts = document.getElementById('total-alerts');
-                    const uniqueUsers = document.getElementById('unique-users');
-                    const uniqueTables = document.getElementById('unique-tables');
-                    
-                    if (data.length === 0) {
-                        alertsContainer.innerHTML = '<div class="no-alerts">No alerts yet. When honeypot tables are accessed, alerts will appear here.</div>';
-                        totalAlerts.textContent = '0';
-                        uniqueUsers.textContent = '0';
-                        uniqueTables.textContent = '0';
+            // Only fetch alerts newer than the cursor; 304 when nothing changed
+            const headers = alertsETag ? {'If-None-Match': alertsETag} : {};
+            fetch('/api/alerts?since=' + alertsCursor, {headers: headers})
+                .then(r => {
+                    if (r.status === 304) {
                         return;
                     }
-                    
-                    // Update statistics
-                    totalAlerts.textContent = data.length;
-                    uniqueUsers.textContent = new Set(data.map(alert => alert.user)).size;
-                    uniqueTables.textContent = new Set(data.map(alert => alert.table)).size;
-                    
-                    // Display alerts
-                    alertsContainer.innerHTML = data.reverse().map(alert => 
-                        '<div class="alert">' +
-                            '<strong>🚨 Honeypot Table Accessed!</strong><br>' +
-                            '<strong>Table:</strong> ' + (alert.table || 'unknown') + '<br>' +
-                            '<strong>User:</strong> ' + (alert.user || 'unknown') + '<br>' +
-                            '<strong>Client IP:</strong> ' + (alert.client_ip || 'unknown') + '<br>' +
-                            '<strong>Message:</strong> ' + (alert.alert || 'Honeypot table accessed') +
-                            '<div class="timestamp">⏰ ' + (alert.timestamp || 'unknown time') + '</div>' +
-                        '</div>'
-                    ).join('');
+                    alertsETag = r.headers.get('ETag');
+                    const cursor = parseInt(r.headers.get('X-Alerts-Cursor') || '0', 10);
+                    return r.json().then(data => {
+                        if (cursor < alertsCursor) {
+                            // The server restarted and its ids started over: it sent the full list
+                            resetAlerts();
+                        }
+                        addAlerts(data, cursor);
+                    });
                 })
                 .catch(error => {
                     console.error('Error loading alerts:', error);
-                    document.getElementById('alerts').innerHTML = '<div class="no-alerts">Error loading alerts. Make sure the honeypot service is running.</div>';
+                    if (alerts.length === 0) {
+                        document.getElementById('alerts').innerHTML = '<div class="no-alerts">Error loading alerts. Make sure the honeypot service is running.</div>';
+                    }
                 });
         }
         
-        // Load alerts on page load
-        loadAlerts();
+        function connectAlertStream() {
+            if (!window.EventSource) {
+                // No SSE support: fall back to polling for deltas
+                loadAlerts();
+                setInterval(loadAlerts, 30000);
+                return;
+            }
+            
+            // The server replays the recent backlog on connect and, after a
+            // dropped connection, everything after Last-Event-ID
+            const source = new EventSource('/api/alerts/stream?backlog=' + MAX_ALERTS);
+            // Sent before a full replay (e.g. the server restarted and its ids started over)
+            source.addEventListener('reset', () => resetAlerts());
+            source.onmessage = event => {
+                addAlerts([JSON.parse(event.data)], parseInt(event.lastEventId || '0', 10));
+            };
+        }
         
-        // Auto-refresh every 30 seconds
-        setInterval(loadAlerts, 30000);
+        // Live alerts over Server-Sent Events
+        renderAlerts();
+        connectAlertStream();
     </script>
 </body>
 </html>'''
+
+DASHBOARD_PAGE = RenderedPage(DASHBOARD_HTML)
+
+class DashboardHandler(SimpleHTTPRequestHandler):
+    # Write timeout so a stalled stream client cannot hold its thread forever
+    timeout = 30
+
+    def do_GET(self):
+        parsed_path = urlparse(self.path)
+        if parsed_path.path == '/api/alerts/stream':
+            self.stream_alerts(parse_qs(parsed_path.query))
+        elif parsed_path.path == '/':
+            self.send_page(DASHBOARD_PAGE)
             
-            self.wfile.write(html.encode())
-            
-        elif self.path == '/api/alerts':
-            alerts = []
-            alerts_file = '/app/logs/honeypot_alerts.json'
-            
+        elif parsed_path.path == '/api/alerts':
+            # Last 100 alerts, or only those after ?since=<event id>; 304 when unchanged
             try:
-                if os.path.exists(alerts_file):
-                    with open(alerts_file, 'r') as f:
-                        for line in f:
-                            line = line.strip()
-                            if line:
-                                try:
-                                    alerts.append(json.loads(line))
-                                except json.JSONDecodeError:
-                                    continue
-            except Exception as e:
-                print(f"Error reading alerts file: {e}")
-            
-            self.send_response(200)
+                since = parse_qs(parsed_path.query).get('since', [None])[0]
+                since = int(since) if since else None
+            except ValueError:
+                self.send_response(400)
+                self.end_headers()
+                return
+
+            feed = self.server.feed
+            last_id, alerts = feed.since(since, 100)
+            etag = f'"{feed.epoch}-{last_id}"'
+            status = 304 if self.headers.get('If-None-Match') == etag else 200
+
+            self.send_response(status)
             self.send_header('Content-type', 'application/json')
             self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Expose-Headers', 'ETag, X-Alerts-Cursor')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('ETag', etag)
+            self.send_header('X-Alerts-Cursor', str(last_id))
             self.end_headers()
-            
-            # Return last 100 alerts
-            response_data = alerts[-100:] if alerts else []
-            self.wfile.write(json.dumps(response_data).encode())
+            if status == 200:
+                self.wfile.write(json.dumps(alerts).encode())
         
         else:
             # Return 404 for other paths
             self.send_response(404)
             self.end_headers()
 
+    def send_page(self, page):
+        """Serve a pre-rendered page: gzip when accepted, 304 on a matching If-None-Match"""
+        gzipped = accepts_gzip(self.headers.get('Accept-Encoding'))
+        body, etag = page.variant(gzipped)
+        not_modified = page.matches(self.headers.get('If-None-Match'))
+
+        self.send_response(304 if not_modified else 200)
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', page.cache_control)
+        self.send_header('Vary', 'Accept-Encoding')
+        if not_modified:
+            self.end_headers()
+            return
+        self.send_header('Content-type', page.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_alerts(self, params):
+        """Server-Sent Events: replay from Last-Event-ID (or a backlog), then push new alerts"""
+        feed = self.server.feed
+        try:
+            last_id = self.headers.get('Last-Event-ID') or params.get('last_id', [None])[0]
+            last_id = int(last_id) if last_id else None
+            backlog = max(0, int(params.get('backlog', ['100'])[0]))
+        except ValueError:
+            self.send_response(400)
+            self.end_headers()
+            return
+
+        if not self.server.stream_slots.acquire(blocking=False):
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(b'retry: 3000\n\n')
+
+            events = feed.events_after(last_id, backlog)
+            cursor = last_id if last_id is not None else feed.last_id
+            if events is None:
+                # Too old to resume exactly, or from before a restart: tell the page to
+                # clear its list, then replay everything still buffered
+                self.wfile.write(RESET_FRAME)
+                events = feed.events_after(None, feed.events.maxlen)
+                cursor = 0
+            while events is not None:
+                if events:
+                    cursor = events[-1][0]
+                self.wfile.write(b''.join(frame for _, frame, _ in events) if events else b': heartbeat\n\n')
+                self.wfile.flush()
+                feed.wait(cursor, self.server.heartbeat)
+                events = feed.events_after(cursor)
+            # Fell behind the buffer: drop the client, it reconnects with Last-Event-ID
+        except OSError:
+            pass
+        finally:
+            self.server.stream_slots.release()
+
 if __name__ == '__main__':
     port = 8090
-    server = HTTPServer(('0.0.0.0', port), DashboardHandler)
+    server = ThreadingHTTPServer(('0.0.0.0', port), DashboardHandler)
+    server.daemon_threads = True
+    server.feed = AlertFeed(ALERTS_FILE, buffer_size=int(os.getenv('DASHBOARD_STREAM_BUFFER', '500'))).start()
+    server.stream_slots = threading.BoundedSemaphore(int(os.getenv('DASHBOARD_STREAM_CLIENTS', '50')))
+    server.heartbeat = float(os.getenv('DASHBOARD_STREAM_HEARTBEAT', '15'))
     print(f'🍯 Honeypot Dashboard running on http://localhost:{port}')
-    print('Dashboard will auto-refresh every 30 seconds')
+    print('Alerts are pushed live over /api/alerts/stream')
     try:
         server.serve_forever()
     except KeyboardInterrupt:
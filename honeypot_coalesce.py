@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Alert storm coalescing keyed on (table, user, client_ip)"""
+
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+class AlertCoalescer:
+    """Collapses bursts of near-identical alerts into one alert per window
+
+    The first alert for a (table, user, client_ip) key passes through at
+    once (with count=1). Further alerts for that key within window seconds
+    are only counted; when the window closes a single summary alert is
+    emitted carrying count, first_seen and last_seen of the suppressed
+    alerts, and a new window opens. A key with no activity during its
+    window is forgotten, so state lives in a TTL map; at most max_keys keys
+    are tracked and the oldest window is closed early to make room.
+
+    Not thread-safe: offer() and due() are meant to be called from the
+    single alert dispatch thread.
+    """
+
+    def __init__(self, window=10, max_keys=10000):
+        self.window = window
+        self.max_keys = max(1, max_keys)
+        # key -> entry, ordered by window deadline
+        self.entries = OrderedDict()
+        self._evicted = []
+
+    @classmethod
+    def from_env(cls):
+        """Build from HONEYPOT_COALESCE_* variables, or None when the window is 0"""
+        window = float(os.getenv('HONEYPOT_COALESCE_WINDOW', '10'))
+        if window <= 0:
+            return None
+        return cls(window=window, max_keys=int(os.getenv('HONEYPOT_COALESCE_MAX_KEYS', '10000')))
+
+    def offer(self, alert_data):
+        """Register an alert; returns True if it should be emitted right away"""
+        key = (alert_data.get('table'), alert_data.get('user'), alert_data.get('client_ip'))
+        seen = alert_data.get('timestamp') or datetime.now().isoformat()
+        entry = self.entries.get(key)
+
+        if entry is None:
+            if len(self.entries) >= self.max_keys:
+                _, oldest = self.entries.popitem(last=False)
+                if oldest["count"]:
+                    self._evicted.append(self._summary(oldest))
+            self.entries[key] = self._new_entry()
+            alert_data.update(count=1, first_seen=seen, last_seen=seen)
+            return True
+
+        if not entry["count"]:
+            entry["first_seen"] = seen
+        entry["count"] += 1
+        entry["last_seen"] = seen
+        entry["alert"] = alert_data
+        return False
+
+    def due(self, now=None):
+        """Summary alerts for windows that have closed"""
+        now = time.monotonic() if now is None else now
+        summaries, self._evicted = self._evicted, []
+
+        while self.entries:
+            key, entry = next(iter(self.entries.items()))
+            if entry["deadline"] > now:
+                break
+            if entry["count"]:
+                summaries.append(self._summary(entry))
+                self.entries[key] = self._new_entry(now)
+                self.entries.move_to_end(key)
+            else:
+                del self.entries[key]
+        return summaries
+
+    def drain(self):
+        """Summaries for every open window (used on shutdown)"""
+        summaries, self._evicted = self._evicted, []
+        summaries.extend(self._summary(entry) for entry in self.entries.values() if entry["count"])
+        self.entries.clear()
+        return summaries
+
+    def _new_entry(self, now=None):
+        now = time.monotonic() if now is None else now
+        return {"deadline": now + self.window, "count": 0, "first_seen": None, "last_seen": None, "alert": None}
+
+    def _summary(self, entry):
+        summary = dict(entry["alert"])
+        summary.pop('alert_id', None)
+        summary.update(
+            count=entry["count"],
+            first_seen=entry["first_seen"],
+            last_seen=entry["last_seen"],
+            coalesced=True
+        )
+        return summary
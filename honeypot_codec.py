@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""JSON encoding and decoding shared by the honeypot services
+
+orjson is used when it is installed (HONEYPOT_JSON_BACKEND=stdlib forces
+the standard library). Both backends produce compact UTF-8 output and
+convert database types while serializing, in a single pass: Decimal and
+other numeric types become floats, datetime/date/time become ISO 8601
+strings, UUIDs become strings and bytes (bytea columns) become base64
+strings. Any other type raises TypeError.
+
+The one difference is non-finite floats: orjson writes NaN and Infinity
+as null, the stdlib writes the bare tokens NaN and Infinity, which
+loads() accepts but strict JSON parsers reject.
+"""
+
+import base64
+import json
+import os
+from decimal import Decimal
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if os.getenv('HONEYPOT_JSON_BACKEND', '').lower() == 'stdlib':
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+# Raised by loads() for malformed input (orjson's error subclasses it)
+DecodeError = json.JSONDecodeError
+
+def default(obj):
+    """Conversion for values JSON has no type for"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    if hasattr(obj, '__float__'):
+        return float(obj)
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return base64.b64encode(obj).decode('ascii')
+    if isinstance(obj, UUID):
+        # orjson serializes UUIDs natively; match it
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj):
+        """Serialize to UTF-8 bytes"""
+        return orjson.dumps(obj, default=default, option=_OPTIONS)
+
+    def dumps_lines(records):
+        """Serialize an iterable of records as NDJSON bytes (one record per line)"""
+        return b''.join([orjson.dumps(record, default=default, option=_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+                         for record in records])
+
+    loads = orjson.loads
+
+else:
+    _encoder = json.JSONEncoder(default=default, ensure_ascii=False, separators=(',', ':'))
+
+    def dumps(obj):
+        """Serialize to UTF-8 bytes"""
+        return _encoder.encode(obj).encode('utf-8')
+
+    def dumps_lines(records):
+        """Serialize an iterable of records as NDJSON bytes (one record per line)"""
+        encode = _encoder.encode
+        return ''.join([encode(record) + '\n' for record in records]).encode('utf-8')
+
+    def loads(data):
+        """Parse JSON from str, bytes or bytearray"""
+        return json.loads(data)
+
+def dumps_text(obj):
+    """Serialize to str (for text files and text database columns)"""
+    return dumps(obj).decode('utf-8')
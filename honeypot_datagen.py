@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Deterministic columnar generator for virtual honeypot rows"""
+
+import hashlib
+from datetime import datetime, timedelta
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# created_at of row id N is BASE_TIME + N seconds
+BASE_TIME = datetime(2024, 1, 1)
+
+MASK64 = (1 << 64) - 1
+DATA_TYPES = ('credit_card', 'ssn', 'api_key', 'password')
+
+def table_kind(table_name):
+    """Which fake schema a honeypot table gets, judging by its name"""
+    if 'financial' in table_name or 'account' in table_name:
+        return 'financial'
+    if 'customer' in table_name:
+        return 'customer'
+    if 'employee' in table_name:
+        return 'employee'
+    return 'generic'
+
+def _table_key(table_name, seed):
+    """64-bit stream key for (table, seed)"""
+    digest = hashlib.blake2b(f"{table_name}:{seed}".encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+def _mix(ids, key):
+    """splitmix64 of key + id for every id (pure Python)"""
+    out = []
+    for i in ids:
+        z = (key + i * 0x9E3779B97F4A7C15) & MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        out.append(z ^ (z >> 31))
+    return out
+
+def _mix_np(ids, key):
+    """splitmix64 of key + id for an array of ids (uint64 arithmetic wraps)"""
+    z = np.uint64(key) + ids * np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+_clock = None
+
+def _timestamps(first_id, count):
+    """ISO created_at strings for ids first_id .. first_id + count - 1
+
+    Ids are consecutive seconds, so each day is a date prefix joined to
+    slices of a shared table of the 86400 "HH:MM:SS" strings.
+    """
+    global _clock
+    if _clock is None:
+        _clock = [f"{h:02d}:{m:02d}:{s:02d}" for h in range(24) for m in range(60) for s in range(60)]
+
+    out = []
+    i, end = first_id, first_id + count
+    while i < end:
+        day, second = divmod(i, 86400)
+        stop = min(end - i, 86400 - second) + second
+        prefix = (BASE_TIME + timedelta(days=day)).strftime('%Y-%m-%dT')
+        out.extend(map(prefix.__add__, _clock[second:stop]))
+        i += stop - second
+    return out
+
+def generate_columns(table_name, offset, count, seed=0):
+    """Generate rows offset+1 .. offset+count of a table as a dict of column lists
+
+    Every value is a pure function of (table, seed, row id), so any page
+    can be produced directly. Random-looking values come from one
+    splitmix64 hash per row (vectorized with NumPy when available).
+    """
+    first_id = offset + 1
+    ids = list(range(first_id, first_id + count))
+    key = _table_key(table_name, seed)
+    kind = table_kind(table_name)
+
+    if np is not None:
+        hashes = _mix_np(np.arange(first_id, first_id + count, dtype=np.uint64), key)
+    else:
+        hashes = _mix(ids, key)
+
+    columns = {'id': ids}
+
+    if kind == 'financial':
+        columns['account_number'] = [f'ACC-{i * 97:08d}' for i in ids]
+        if np is not None:
+            balance = (np.uint64(10000) + hashes % np.uint64(9990001)).astype('float64') / 100.0
+            routing = np.uint64(100000000) + (hashes >> np.uint64(20)) % np.uint64(900000000)
+            columns['balance'] = balance.tolist()
+            columns['routing_number'] = routing.astype(str).tolist()
+        else:
+            columns['balance'] = [(10000 + h % 9990001) / 100.0 for h in hashes]
+            columns['routing_number'] = [str(100000000 + (h >> 20) % 900000000) for h in hashes]
+
+    elif kind == 'customer':
+        columns['customer_id'] = [f'CUST-{i * 13:06d}' for i in ids]
+        columns['ssn'] = [f'{(i * 11) % 999:03d}-{(i * 13) % 99:02d}-{(i * 17) % 9999:04d}' for i in ids]
+
+    elif kind == 'employee':
+        columns['employee_id'] = [f'EMP-{i:06d}' for i in ids]
+        hashes = hashes.tolist() if np is not None else hashes
+        # data_type cycles with id % 4: fill each quarter of the column with one comprehension
+        sensitive = [None] * count
+        data_types = [None] * count
+        for r, data_type in enumerate(DATA_TYPES):
+            j = (r - first_id) % 4
+            part = ids[j::4]
+            if data_type == 'credit_card':
+                values = [f'4532-{(i * 1234) % 10000:04d}-{(i * 5678) % 10000:04d}-{(i * 9012) % 10000:04d}' for i in part]
+            elif data_type == 'ssn':
+                values = [f'{(i * 11) % 999:03d}-{(i * 13) % 99:02d}-{(i * 17) % 9999:04d}' for i in part]
+            elif data_type == 'api_key':
+                values = [f'sk-{h:016x}{(h * 0x9E3779B97F4A7C15) & MASK64:016x}' for h in hashes[j::4]]
+            else:
+                values = [f'Password{i}!@#' for i in part]
+            sensitive[j::4] = values
+            data_types[j::4] = [data_type] * len(part)
+        columns['sensitive_data'] = sensitive
+        columns['data_type'] = data_types
+
+    else:
+        hashes = hashes.tolist() if np is not None else hashes
+        columns['sensitive_data'] = [f'Generated data #{i}: {h:016x}' for i, h in zip(ids, hashes)]
+
+    columns['created_at'] = _timestamps(first_id, count)
+    columns['_generated'] = ['virtual_data'] * count
+    return columns
+
+def generate_rows(table_name, offset, count, seed=0):
+    """Rows offset+1 .. offset+count as a list of dicts"""
+    if count <= 0:
+        return []
+    columns = generate_columns(table_name, offset, count, seed)
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+def iter_rows(table_name, offset, count, seed=0, batch_size=10000):
+    """Yield rows offset+1 .. offset+count one batch of columns at a time"""
+    end = offset + count
+    while offset < end:
+        n = min(batch_size, end - offset)
+        yield from generate_rows(table_name, offset, n, seed)
+        offset += n
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Shared keep-alive HTTP client for outbound alert traffic"""
+
+import logging
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import honeypot_codec as codec
+
+logger = logging.getLogger(__name__)
+
+class OutboundClient:
+    """Thread-safe HTTP client with persistent per-host connection pools
+
+    All outbound alert traffic (forwarders, webhook delivery) goes through one
+    requests.Session, so each host keeps up to pool_maxsize warm keep-alive
+    connections instead of paying a TCP/TLS handshake per alert. stats()
+    reports requests vs. connections opened per host to confirm reuse.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, connect_timeout=3.05, read_timeout=10):
+        self.timeout = (connect_timeout, read_timeout)
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session = requests.Session()
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+    @classmethod
+    def from_env(cls):
+        """Build a client from HONEYPOT_HTTP_* variables"""
+        return cls(
+            pool_connections=int(os.getenv('HONEYPOT_HTTP_POOL_HOSTS', '10')),
+            pool_maxsize=int(os.getenv('HONEYPOT_HTTP_POOL_SIZE', '10')),
+            connect_timeout=float(os.getenv('HONEYPOT_HTTP_CONNECT_TIMEOUT', '3.05')),
+            read_timeout=float(os.getenv('HONEYPOT_HTTP_READ_TIMEOUT', '10'))
+        )
+
+    def post_json(self, url, payload, timeout=None):
+        """POST a JSON payload over a pooled connection"""
+        return self.session.post(
+            url,
+            data=codec.dumps(payload),
+            timeout=timeout or self.timeout,
+            headers={'Content-Type': 'application/json'}
+        )
+
+    def stats(self):
+        """Per-host request and connection counters (reused = requests - connections)"""
+        hosts = {}
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            hosts[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                "requests": pool.num_requests,
+                "connections": pool.num_connections,
+                "reused": max(0, pool.num_requests - pool.num_connections)
+            }
+
+        return {
+            "requests": sum(h["requests"] for h in hosts.values()),
+            "connections": sum(h["connections"] for h in hosts.values()),
+            "reused": sum(h["reused"] for h in hosts.values()),
+            "hosts": hosts
+        }
+
+    def close(self):
+        self.session.close()
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Return the process-wide OutboundClient, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OutboundClient.from_env()
+    return _client
@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 
-import json
 import logging
 import os
 import sys
@@ -9,16 +8,24 @@ from http.server import BaseHTTPRequestHandler, HTTPServer
 from urllib.parse import urlparse, parse_qs
 import threading
 import signal
+import time
 
 import psycopg2
-import requests
+
+import honeypot_codec as codec
+from honeypot_http import get_client
+from honeypot_metrics import (
+    ALERT_HANDLE_SECONDS, CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY, REQUEST_SECONDS, REQUESTS_IN_FLIGHT
+)
+from honeypot_webhook import WebhookDispatcher
+from honeypot_writer import AlertFileWriter, compressing_log_handler
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('honeypot.log'),
+        compressing_log_handler('honeypot.log'),
         logging.StreamHandler()
     ]
 )
@@ -27,24 +34,67 @@ logger = logging.getLogger(__name__)
 class HoneypotAlertHandler(BaseHTTPRequestHandler):
     """HTTP handler for receiving honeypot alerts"""
     
+    # Paths reported as-is in request metrics; anything else is counted as "other"
+    METRIC_PATHS = frozenset(['/health', '/metrics', '/api/outbound', '/alert'])
+    
     def do_GET(self):
+        self.observe_request(self.handle_get)
+    
+    def do_POST(self):
+        self.observe_request(self.handle_post)
+    
+    def observe_request(self, handler):
+        """Run a request handler, recording its latency and the in-flight count"""
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            handler()
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            path = urlparse(self.path).path
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=self.command,
+                path=path if path in self.METRIC_PATHS else 'other'
+            )
+    
+    def handle_get(self):
         if self.path == '/health':
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
             self.wfile.write(b'{"status": "healthy", "service": "honeypot_listener"}')
+        elif self.path == '/api/outbound':
+            webhook = getattr(self.server, 'webhook', None)
+            stats = {
+                "http": get_client().stats(),
+                "webhook": dict(webhook.stats) if webhook else None
+            }
+            self.send_response(200)
+            self.send_header('Content-type', 'application/json')
+            self.end_headers()
+            self.wfile.write(codec.dumps(stats))
+        elif self.path == '/metrics':
+            body = REGISTRY.exposition()
+            self.send_response(200)
+            self.send_header('Content-type', METRICS_CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
         else:
             self.send_response(404)
             self.end_headers()
     
-    def do_POST(self):
+    def handle_post(self):
         try:
+            started = time.perf_counter()
             content_length = int(self.headers.get('Content-Length', 0))
             post_data = self.rfile.read(content_length)
             
             if self.path == '/alert':
-                alert_data = json.loads(post_data.decode('utf-8'))
+                alert_data = codec.loads(post_data)
                 self.process_alert(alert_data)
+                ALERT_HANDLE_SECONDS.observe(time.perf_counter() - started)
                 
                 self.send_response(200)
                 self.send_header('Content-type', 'application/json')
@@ -73,23 +123,13 @@ class HoneypotAlertHandler(BaseHTTPRequestHandler):
             'alert_message': alert_data.get('alert')
         }
         
-        # Write to alerts log
-        with open('honeypot_alerts.json', 'a') as f:
-            f.write(json.dumps(alert_entry) + '\n')
+        # Hand off to the group-commit writer for the alerts log
+        self.server.writer.write(alert_entry)
         
-        # Send to external monitoring system if configured
-        external_webhook = os.getenv('HONEYPOT_WEBHOOK_URL')
-        if external_webhook:
-            try:
-                response = requests.post(
-                    external_webhook,
-                    json=alert_entry,
-                    timeout=10,
-                    headers={'Content-Type': 'application/json'}
-                )
-                logger.info(f"Alert forwarded to webhook: {response.status_code}")
-            except requests.RequestException as e:
-                logger.error(f"Failed to forward alert to webhook: {e}")
+        # Queue for background delivery to the external monitoring system if configured
+        webhook = getattr(self.server, 'webhook', None)
+        if webhook:
+            webhook.submit(alert_entry)
     
     def log_message(self, format, *args):
         """Override to use our logger instead of stderr"""
@@ -103,15 +143,26 @@ class HoneypotListener:
         self.port = port
         self.server = None
         self.running = False
+        self.webhook = None
+        self.writer = None
         
     def start(self):
         """Start the HTTP server"""
         try:
+            self.webhook = WebhookDispatcher.from_env()
+            if self.webhook:
+                self.webhook.start()
+            
+            self.writer = AlertFileWriter.from_env('honeypot_alerts.json').start()
+            
             self.server = HTTPServer((self.host, self.port), HoneypotAlertHandler)
+            self.server.webhook = self.webhook
+            self.server.writer = self.writer
             self.running = True
             
             logger.info(f"Honeypot listener starting on {self.host}:{self.port}")
             logger.info(f"Alert endpoint: http://{self.host}:{self.port}/alert")
+            logger.info(f"Metrics: http://{self.host}:{self.port}/metrics")
             
             # Handle shutdown gracefully
             signal.signal(signal.SIGINT, self.shutdown)
@@ -128,6 +179,10 @@ class HoneypotListener:
         if self.server and self.running:
             logger.info("Shutting down honeypot listener...")
             self.running = False
+            if self.webhook:
+                self.webhook.stop()
+            if self.writer:
+                self.writer.stop()
             self.server.shutdown()
             self.server.server_close()
             logger.info("Honeypot listener stopped")
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Process-wide metrics shared by the honeypot services
+
+Counters, gauges and histograms are kept in per-thread cells: the thread
+that records a value only touches its own cell, so the hot paths never
+wait on a lock. A scrape sums the cells of all threads; cells of threads
+that have exited are folded into one retired cell, so thread churn does
+not grow memory. Registry.exposition() renders the Prometheus text format.
+"""
+
+import bisect
+import threading
+
+# Content-Type of Registry.exposition()
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Default histogram buckets, in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class _Metric:
+    """Base class: label handling and per-thread cells {label values: value}"""
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # (thread, cell) for every thread that has recorded a value
+        self._cells = []
+        self._retired = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def _cell(self):
+        """The calling thread's cell (registered under the lock on first use only)"""
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = {}
+            with self._lock:
+                self._retire_dead()
+                self._cells.append((threading.current_thread(), cell))
+            return cell
+
+    def _retire_dead(self):
+        """Fold the cells of exited threads into the retired cell. Lock held."""
+        alive = []
+        for thread, cell in self._cells:
+            if thread.is_alive():
+                alive.append((thread, cell))
+            else:
+                for key, value in cell.items():
+                    self._retired[key] = self._merge(self._retired.get(key), value)
+        self._cells = alive
+
+    def _merge(self, total, value):
+        return value if total is None else total + value
+
+    def values(self):
+        """Snapshot as {label values tuple: value}, summed over all threads"""
+        with self._lock:
+            self._retire_dead()
+            cells = [dict(self._retired)] + [cell.copy() for _, cell in self._cells]
+        totals = {}
+        for cell in cells:
+            for key, value in cell.items():
+                totals[key] = self._merge(totals.get(key), value)
+        return totals
+
+    def _samples(self):
+        """(suffix, label pairs, value) tuples for the exposition"""
+        for key, value in sorted(self.values().items()):
+            yield '', tuple(zip(self.labelnames, key)), value
+
+class Counter(_Metric):
+    """Monotonically increasing counter, optionally broken down by labels"""
+
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        """Add amount to the series selected by labels"""
+        cell = self._cell()
+        key = self._key(labels)
+        cell[key] = cell.get(key, 0) + amount
+
+class Gauge(_Metric):
+    """Value that goes up and down (e.g. requests in flight)
+
+    inc()/dec() are recorded per thread like counters; a gauge built with
+    function reports that callable's value instead.
+    """
+
+    type = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def inc(self, amount=1, **labels):
+        cell = self._cell()
+        key = self._key(labels)
+        cell[key] = cell.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def values(self):
+        if self.function is not None:
+            return {(): self.function()}
+        return super().values()
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets, plus sum and count"""
+
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """Record one observation"""
+        cell = self._cell()
+        key = self._key(labels)
+        # Per-bucket counts (the last one is +Inf), then the sum
+        series = cell.get(key)
+        if series is None:
+            series = cell[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def _merge(self, total, value):
+        if total is None:
+            return list(value)
+        return [a + b for a, b in zip(total, value)]
+
+    def _samples(self):
+        for key, series in sorted(self.values().items()):
+            labels = tuple(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                yield '_bucket', labels + (('le', _format_value(bound)),), cumulative
+            yield '_sum', labels, series[-1]
+            yield '_count', labels, cumulative
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return repr(value)
+    return str(value)
+
+def _escape(value, quote=True):
+    value = value.replace('\\', '\\\\').replace('\n', '\\n')
+    return value.replace('"', '\\"') if quote else value
+
+class Registry:
+    """Named metrics, created once and looked up by name afterwards"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"metric {name} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """Return the counter called name, creating it on first use"""
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=(), function=None):
+        """Return the gauge called name, creating it on first use"""
+        return self._register(Gauge, name, documentation, labelnames, function=function)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        """Return the histogram called name, creating it on first use"""
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def collect(self):
+        """All registered metrics in registration order"""
+        with self._lock:
+            return list(self._metrics.values())
+
+    def exposition(self):
+        """All metrics in the Prometheus text exposition format (bytes)"""
+        lines = []
+        for metric in self.collect():
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation, quote=False)}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix, labels, value in metric._samples():
+                if labels:
+                    label_text = ','.join(f'{name}="{_escape(str(v))}"' for name, v in labels)
+                    lines.append(f"{metric.name}{suffix}{{{label_text}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{metric.name}{suffix} {_format_value(value)}")
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+
+REGISTRY = Registry()
+
+def counter(name, documentation, labelnames=()):
+    """Counter in the default registry"""
+    return REGISTRY.counter(name, documentation, labelnames)
+
+def gauge(name, documentation, labelnames=(), function=None):
+    """Gauge in the default registry"""
+    return REGISTRY.gauge(name, documentation, labelnames, function)
+
+def histogram(name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+    """Histogram in the default registry"""
+    return REGISTRY.histogram(name, documentation, labelnames, buckets)
+
+# HTTP metrics shared by the listener and the monitor, so both expose the
+# same series under the same names
+REQUEST_SECONDS = histogram(
+    'honeypot_http_request_seconds',
+    'HTTP request handling time',
+    ('method', 'path')
+)
+REQUESTS_IN_FLIGHT = gauge(
+    'honeypot_http_requests_in_flight',
+    'HTTP requests currently being handled'
+)
+ALERT_HANDLE_SECONDS = histogram(
+    'honeypot_alert_handle_seconds',
+    'Time to parse a POST /alert body and hand the alert on for processing'
+)
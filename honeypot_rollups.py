@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Time-bucketed alert rollups per table and client IP"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from honeypot_store import parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Resolution name -> (bucket width in seconds, default retention in buckets)
+RESOLUTIONS = OrderedDict([
+    ('1m', (60, 24 * 60)),
+    ('1h', (3600, 7 * 24)),
+    ('1d', (86400, 90)),
+])
+
+# Query parameter values for group=
+GROUPS = ('table', 'ip')
+
+OTHER_KEY = '__other__'
+
+class RollupEngine:
+    """Per-minute, per-hour and per-day alert counts keyed by table and client IP
+
+    Every alert increments one bucket per resolution; buckets older than the
+    retention of their resolution are evicted as time moves on, so memory is
+    bounded by retention x keys. Each bucket tracks at most max_keys distinct
+    keys per group, the rest are counted under "__other__". On start the
+    buckets can be rebuilt from the indexed alert store (see backfill), so
+    charts survive restarts without touching the raw NDJSON log.
+    """
+
+    def __init__(self, retention=None, max_keys=1000):
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        self.retention = {res: (retention or {}).get(res, default) for res, (_, default) in RESOLUTIONS.items()}
+        # res -> OrderedDict(bucket start -> {"total": n, "table": {...}, "ip": {...}})
+        self.buckets = {res: OrderedDict() for res in RESOLUTIONS}
+
+    @classmethod
+    def from_env(cls):
+        """Build from HONEYPOT_ROLLUP_* variables (retention in buckets per resolution)"""
+        return cls(
+            retention={
+                '1m': int(os.getenv('HONEYPOT_ROLLUP_1M_BUCKETS', '1440')),
+                '1h': int(os.getenv('HONEYPOT_ROLLUP_1H_BUCKETS', '168')),
+                '1d': int(os.getenv('HONEYPOT_ROLLUP_1D_BUCKETS', '90')),
+            },
+            max_keys=int(os.getenv('HONEYPOT_ROLLUP_MAX_KEYS', '1000'))
+        )
+
+    def record(self, alert_data):
+        """Count an alert in every resolution (a coalesced summary counts as its count)"""
+        ts = parse_timestamp(alert_data.get('timestamp'))
+        if ts is None:
+            ts = time.time()
+
+        count = alert_data.get('count', 1)
+        if not isinstance(count, int) or count < 1:
+            count = 1
+
+        with self.lock:
+            for res, (width, _) in RESOLUTIONS.items():
+                self._add(res, int(ts // width) * width, alert_data.get('table'), alert_data.get('client_ip'), count)
+
+    def _add(self, res, start, table_name, client_ip, count=1):
+        """Add count alerts to the bucket at start. Lock held."""
+        bucket = self._bucket(res, start)
+        if bucket is None:
+            return
+        bucket["total"] += count
+        for group, key in (('table', table_name), ('ip', client_ip)):
+            counts = bucket[group]
+            key = key or 'unknown'
+            if key not in counts and len(counts) >= self.max_keys:
+                key = OTHER_KEY
+            counts[key] = counts.get(key, 0) + count
+
+    def _bucket(self, res, start):
+        """Return (creating if needed) the bucket at start; None if it is past retention. Lock held."""
+        buckets = self.buckets[res]
+        width = RESOLUTIONS[res][0]
+        newest = next(reversed(buckets)) if buckets else start
+        horizon = max(newest, start) - (self.retention[res] - 1) * width
+        if start < horizon:
+            return None
+
+        bucket = buckets.get(start)
+        if bucket is None:
+            bucket = {"total": 0}
+            for group in GROUPS:
+                bucket[group] = {}
+            buckets[start] = bucket
+            if start < newest:
+                # Out-of-order alert: keep the buckets sorted by start time
+                for key in [k for k in buckets if k > start]:
+                    buckets.move_to_end(key)
+
+        while buckets and next(iter(buckets)) < horizon:
+            buckets.popitem(last=False)
+        return bucket
+
+    def query(self, group, res, since=None, key=None, top=None):
+        """Buckets of one resolution as [{"ts", "total", "counts"}], oldest first
+
+        since bounds the bucket start (epoch seconds); key keeps a single
+        table/IP; top keeps the top keys of each bucket.
+        """
+        if group not in GROUPS:
+            raise ValueError(f"group must be one of {list(GROUPS)}")
+        if res not in RESOLUTIONS:
+            raise ValueError(f"res must be one of {list(RESOLUTIONS)}")
+
+        # Buckets are only evicted on ingest, so also cut at the retention horizon here
+        width = RESOLUTIONS[res][0]
+        horizon = (int(time.time() // width) - self.retention[res] + 1) * width
+        since = horizon if since is None else max(since, horizon)
+
+        with self.lock:
+            items = [(start, bucket["total"], dict(bucket[group]))
+                     for start, bucket in self.buckets[res].items()
+                     if start >= since]
+
+        result = []
+        for start, total, counts in items:
+            if key is not None:
+                counts = {key: counts[key]} if key in counts else {}
+            elif top:
+                counts = dict(sorted(counts.items(), key=lambda kv: kv[1], reverse=True)[:top])
+            result.append({"ts": start, "total": total, "counts": counts})
+        return result
+
+    def backfill(self, store):
+        """Rebuild the buckets from the alert store's indexed history"""
+        now = time.time()
+        for res, (width, _) in RESOLUTIONS.items():
+            since = (int(now // width) - self.retention[res] + 1) * width
+            rows = store.aggregate(since, width)
+            with self.lock:
+                for start, table_name, client_ip, count in rows:
+                    self._add(res, int(start), table_name, client_ip, count)
+        logger.info("Rebuilt alert rollups from the alert store")
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Running alert statistics with fixed-memory distinct counts"""
+
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+class HyperLogLog:
+    """HyperLogLog cardinality sketch with 2**precision one-byte registers
+
+    Memory is fixed (4 KB at the default precision of 12) no matter how many
+    distinct values are added; the standard error is about
+    1.04 / sqrt(2**precision), i.e. ~1.6% at precision 12. Values are hashed
+    with BLAKE2b so registers stay valid across restarts.
+    """
+
+    def __init__(self, precision=12, registers=None):
+        if not 4 <= precision <= 16:
+            raise ValueError(f"precision must be between 4 and 16, got {precision}")
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.m)
+        if len(self.registers) != self.m:
+            raise ValueError(f"expected {self.m} registers, got {len(self.registers)}")
+        self.alpha = 0.7213 / (1 + 1.079 / self.m)
+        self._estimate = None
+
+    def add(self, value):
+        """Add a value; returns True if a register changed"""
+        h = int.from_bytes(hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest(), 'big')
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            self._estimate = None
+            return True
+        return False
+
+    def count(self):
+        """Estimated number of distinct values (cached until the next register change)"""
+        if self._estimate is None:
+            raw = self.alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+            zeros = self.registers.count(0)
+            if raw <= 2.5 * self.m and zeros:
+                # Small-range correction: linear counting
+                raw = self.m * math.log(self.m / zeros)
+            self._estimate = int(round(raw))
+        return self._estimate
+
+    def dump(self):
+        return base64.b64encode(bytes(self.registers)).decode('ascii')
+
+    @classmethod
+    def load(cls, data, precision=12):
+        return cls(precision, base64.b64decode(data))
+
+class AlertStats:
+    """Alert counters maintained on ingest and served in O(1)
+
+    Totals are exact; distinct users, client IPs and tables come from
+    HyperLogLog sketches. The state is snapshotted atomically to
+    snapshot_file every snapshot_interval seconds (and on stop), and
+    reloaded on start, so counts survive restarts minus at most one
+    interval of alerts after a crash.
+    """
+
+    DISTINCT_FIELDS = (('users', 'user'), ('client_ips', 'client_ip'), ('tables', 'table'))
+
+    def __init__(self, snapshot_file=None, snapshot_interval=60, precision=12):
+        self.snapshot_file = snapshot_file
+        self.snapshot_interval = snapshot_interval
+        self.precision = precision
+        self.lock = threading.Lock()
+        self.total = 0
+        self.first_alert_at = None
+        self.last_alert_at = None
+        self.sketches = {name: HyperLogLog(precision) for name, _ in self.DISTINCT_FIELDS}
+        self._dirty = False
+        self._stopping = threading.Event()
+        self.thread = None
+
+    @classmethod
+    def from_env(cls):
+        """Build from HONEYPOT_STATS_* variables"""
+        return cls(
+            snapshot_file=os.getenv('HONEYPOT_STATS_FILE', '/app/logs/honeypot_stats.json'),
+            snapshot_interval=float(os.getenv('HONEYPOT_STATS_SNAPSHOT_INTERVAL', '60')),
+            precision=int(os.getenv('HONEYPOT_STATS_PRECISION', '12'))
+        )
+
+    def start(self):
+        """Load the last snapshot and start the periodic snapshot thread"""
+        self.load()
+        if self.snapshot_file:
+            self.thread = threading.Thread(target=self._snapshot_loop, name="stats-snapshot", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        """Stop the snapshot thread and write a final snapshot"""
+        self._stopping.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+        self.save()
+
+    def record(self, alert_data):
+        """Count one alert (or a coalesced summary of several)"""
+        timestamp = alert_data.get('timestamp') or datetime.now().isoformat()
+        with self.lock:
+            # A coalesced alert stands for count raw alerts
+            count = alert_data.get('count', 1)
+            self.total += count if isinstance(count, int) and count > 0 else 1
+            if self.first_alert_at is None:
+                self.first_alert_at = timestamp
+            self.last_alert_at = timestamp
+            for name, field in self.DISTINCT_FIELDS:
+                value = alert_data.get(field)
+                if value:
+                    self.sketches[name].add(value)
+            self._dirty = True
+
+    def snapshot(self):
+        """Current counters as a JSON-ready dict"""
+        with self.lock:
+            return {
+                "total_alerts": self.total,
+                "unique_users": self.sketches['users'].count(),
+                "unique_client_ips": self.sketches['client_ips'].count(),
+                "unique_tables": self.sketches['tables'].count(),
+                "first_alert_at": self.first_alert_at,
+                "last_alert_at": self.last_alert_at,
+                "approximate": ["unique_users", "unique_client_ips", "unique_tables"]
+            }
+
+    def load(self):
+        """Restore counters from snapshot_file, if present"""
+        if not self.snapshot_file or not os.path.exists(self.snapshot_file):
+            return
+        try:
+            with open(self.snapshot_file, 'r') as f:
+                state = json.load(f)
+            if state.get("precision") != self.precision:
+                logger.warning("Stats snapshot precision changed, starting distinct counts over")
+                sketches = self.sketches
+            else:
+                sketches = {name: HyperLogLog.load(state["sketches"][name], self.precision)
+                            for name, _ in self.DISTINCT_FIELDS}
+            with self.lock:
+                self.total = state.get("total_alerts", 0)
+                self.first_alert_at = state.get("first_alert_at")
+                self.last_alert_at = state.get("last_alert_at")
+                self.sketches = sketches
+            logger.info(f"Loaded alert statistics: {self.total} alerts so far")
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Failed to load stats snapshot {self.snapshot_file}: {e}")
+
+    def save(self):
+        """Atomically write the snapshot: temp file, fsync, rename"""
+        if not self.snapshot_file:
+            return
+        with self.lock:
+            if not self._dirty:
+                return
+            state = {
+                "total_alerts": self.total,
+                "first_alert_at": self.first_alert_at,
+                "last_alert_at": self.last_alert_at,
+                "precision": self.precision,
+                "sketches": {name: sketch.dump() for name, sketch in self.sketches.items()},
+                "updated_at": datetime.now().isoformat()
+            }
+            self._dirty = False
+
+        tmp_file = f"{self.snapshot_file}.tmp"
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.snapshot_file)
+        except OSError as e:
+            self._dirty = True
+            logger.error(f"Failed to save stats snapshot: {e}")
+
+    def _snapshot_loop(self):
+        while not self._stopping.wait(self.snapshot_interval):
+            self.save()
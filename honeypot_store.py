@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Indexed embedded alert store (SQLite) for the honeypot monitor"""
+
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import honeypot_codec as codec
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    table_name TEXT,
+    user_name TEXT,
+    client_ip TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_ts ON alerts (ts);
+CREATE INDEX IF NOT EXISTS idx_alerts_table ON alerts (table_name, id);
+CREATE INDEX IF NOT EXISTS idx_alerts_user ON alerts (user_name, id);
+CREATE INDEX IF NOT EXISTS idx_alerts_client_ip ON alerts (client_ip, id);
+"""
+
+# Query parameter -> indexed column
+FILTER_COLUMNS = {
+    'table': 'table_name',
+    'user': 'user_name',
+    'client_ip': 'client_ip',
+}
+
+def parse_timestamp(value):
+    """Turn an alert timestamp (ISO string or epoch number) into epoch seconds, or None"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return None
+
+class AlertStore:
+    """Append-only alert history with indexes on timestamp, table, user and client IP
+
+    Every alert gets a monotonically increasing id, which doubles as the
+    pagination cursor: query() returns newest-first pages and next_cursor is
+    the smallest id on the page, so the next page is simply "id < cursor".
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def add(self, alert_data):
+        """Insert an alert and return its id"""
+        ts = parse_timestamp(alert_data.get('timestamp'))
+        if ts is None:
+            ts = time.time()
+
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT INTO alerts (ts, table_name, user_name, client_ip, data) VALUES (?, ?, ?, ?, ?)",
+                (
+                    ts,
+                    alert_data.get('table'),
+                    alert_data.get('user'),
+                    alert_data.get('client_ip'),
+                    codec.dumps_text(alert_data)
+                )
+            )
+            self.conn.commit()
+            return cursor.lastrowid
+
+    def query(self, filters=None, since=None, until=None, cursor=None, limit=100):
+        """Return {"alerts": [...], "next_cursor": id or None}, newest first
+
+        filters maps 'table' / 'user' / 'client_ip' to exact values; since and
+        until bound the alert timestamp (ISO string or epoch seconds) and
+        raise ValueError when they cannot be parsed.
+        """
+        clauses = []
+        args = []
+
+        for key, value in (filters or {}).items():
+            column = FILTER_COLUMNS.get(key)
+            if column and value:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+
+        for name, value, op in (('since', since, '>='), ('until', until, '<')):
+            if not value:
+                continue
+            ts = parse_timestamp(value)
+            if ts is None:
+                raise ValueError(f"{name}={value!r}")
+            clauses.append(f"ts {op} ?")
+            args.append(ts)
+
+        if cursor:
+            clauses.append("id < ?")
+            args.append(int(cursor))
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        args.append(limit + 1)
+
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT id, data FROM alerts {where} ORDER BY id DESC LIMIT ?",
+                args
+            ).fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        alerts = []
+        for alert_id, data in rows:
+            alert = codec.loads(data)
+            alert['alert_id'] = alert_id
+            alerts.append(alert)
+
+        return {
+            "alerts": alerts,
+            "next_cursor": rows[-1][0] if has_more else None
+        }
+
+    def aggregate(self, since, bucket_seconds):
+        """Alert counts per (bucket start, table, client IP) for alerts at or after since
+
+        A coalesced summary counts as its "count" field (a positive integer),
+        like RollupEngine.record does; any other alert counts as 1.
+        """
+        with self.lock:
+            return self.conn.execute(
+                "SELECT CAST(ts / ? AS INTEGER) * ?, table_name, client_ip, "
+                "SUM(CASE WHEN json_type(data, '$.count') = 'integer' AND json_extract(data, '$.count') > 0 "
+                "THEN json_extract(data, '$.count') ELSE 1 END) "
+                "FROM alerts WHERE ts >= ? GROUP BY 1, 2, 3 ORDER BY 1",
+                (bucket_seconds, bucket_seconds, since)
+            ).fetchall()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Background webhook delivery for honeypot alerts"""
+
+import logging
+import os
+import queue
+import random
+import threading
+import time
+
+import requests
+
+from honeypot_http import get_client
+from honeypot_metrics import counter, histogram
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_SECONDS = histogram(
+    'honeypot_webhook_delivery_seconds',
+    'Duration of each webhook POST attempt',
+    ('outcome',)
+)
+DELIVERY_FAILURES = counter(
+    'honeypot_webhook_failures_total',
+    'Alerts that could not be delivered to the webhook',
+    ('reason',)
+)
+
+def _outcome(status_code):
+    """Histogram label for an HTTP status: success, retryable or rejected"""
+    if status_code < 400:
+        return "success"
+    if status_code == 429 or status_code >= 500:
+        return "retryable"
+    return "rejected"
+
+class WebhookDispatcher:
+    """Delivers alerts to an external webhook from background worker threads
+
+    submit() only enqueues, so request handlers return immediately no matter
+    how slow the SIEM is. Failed deliveries (connection errors, 429 and 5xx)
+    are retried with exponential backoff and full jitter; once max_retries is
+    exhausted the alert is logged and dropped. With batch_size > 1 each POST
+    carries a JSON array of up to batch_size alerts, or whatever is pending
+    after batch_interval_ms. Requests go through the shared keep-alive
+    OutboundClient, which also supplies the connect/read timeouts.
+    """
+
+    _STOP = object()
+
+    def __init__(self, url, workers=2, queue_size=10000, max_retries=5,
+                 backoff_base=0.5, backoff_max=30.0, batch_size=1,
+                 batch_interval_ms=1000, client=None):
+        self.url = url
+        self.client = client or get_client()
+        self.workers = max(1, workers)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.batch_size = max(1, batch_size)
+        self.batch_interval = batch_interval_ms / 1000.0
+        self.threads = []
+        self._stopping = threading.Event()
+        self._stats_lock = threading.Lock()
+        self.stats = {"delivered": 0, "failed": 0, "dropped": 0, "retries": 0}
+
+    @classmethod
+    def from_env(cls, url=None):
+        """Build a dispatcher from HONEYPOT_WEBHOOK_* variables, or None if no URL is set"""
+        url = url or os.getenv('HONEYPOT_WEBHOOK_URL')
+        if not url:
+            return None
+
+        return cls(
+            url,
+            workers=int(os.getenv('HONEYPOT_WEBHOOK_WORKERS', '2')),
+            queue_size=int(os.getenv('HONEYPOT_WEBHOOK_QUEUE_SIZE', '10000')),
+            max_retries=int(os.getenv('HONEYPOT_WEBHOOK_MAX_RETRIES', '5')),
+            backoff_base=float(os.getenv('HONEYPOT_WEBHOOK_BACKOFF_BASE', '0.5')),
+            backoff_max=float(os.getenv('HONEYPOT_WEBHOOK_BACKOFF_MAX', '30')),
+            batch_size=int(os.getenv('HONEYPOT_WEBHOOK_BATCH_SIZE', '1')),
+            batch_interval_ms=int(os.getenv('HONEYPOT_WEBHOOK_BATCH_MS', '1000'))
+        )
+
+    def start(self):
+        """Start the delivery workers"""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"webhook-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+        mode = f"batches of {self.batch_size}" if self.batch_size > 1 else "single alerts"
+        logger.info(f"Webhook delivery started: {self.url} ({self.workers} workers, {mode})")
+        return self
+
+    def submit(self, alert_data):
+        """Queue an alert for delivery without blocking; returns False if it was dropped"""
+        try:
+            self.queue.put_nowait(alert_data)
+            return True
+        except queue.Full:
+            self._count("dropped")
+            DELIVERY_FAILURES.inc(reason="queue_full")
+            logger.error("Webhook queue is full, alert dropped")
+            return False
+
+    def stop(self, timeout=5):
+        """Flush what is already queued (abandoning retries) and stop the workers"""
+        self._stopping.set()
+        for _ in self.threads:
+            try:
+                self.queue.put(self._STOP, timeout=timeout)
+            except queue.Full:
+                break
+
+        deadline = time.monotonic() + timeout
+        for thread in self.threads:
+            thread.join(max(0, deadline - time.monotonic()))
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def _next_batch(self):
+        """Block for the next alert, then gather more until the batch is full or the interval elapses"""
+        first = self.queue.get()
+        if first is self._STOP:
+            return None
+
+        batch = [first]
+        deadline = time.monotonic() + self.batch_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is self._STOP:
+                # Hand the sentinel back for this worker's next iteration
+                self.queue.put(item)
+                break
+            batch.append(item)
+
+        return batch
+
+    def _worker_loop(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                break
+
+            payload = batch if self.batch_size > 1 else batch[0]
+            try:
+                self._deliver(payload, len(batch))
+            except Exception as e:
+                self._count("failed", len(batch))
+                DELIVERY_FAILURES.inc(len(batch), reason="error")
+                logger.error(f"Unexpected webhook delivery error: {e}")
+
+    def _deliver(self, payload, count):
+        """POST one payload, retrying transient failures with jittered exponential backoff"""
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                response = self.client.post_json(self.url, payload)
+                DELIVERY_SECONDS.observe(time.perf_counter() - started, outcome=_outcome(response.status_code))
+                if response.status_code < 400:
+                    self._count("delivered", count)
+                    logger.info(f"Alert forwarded to webhook: {response.status_code} ({count} alert(s))")
+                    return True
+                if response.status_code != 429 and response.status_code < 500:
+                    # Client errors will not go away by retrying
+                    self._count("failed", count)
+                    DELIVERY_FAILURES.inc(count, reason="rejected")
+                    logger.error(f"Webhook rejected {count} alert(s): {response.status_code}")
+                    return False
+                error = f"HTTP {response.status_code}"
+            except requests.RequestException as e:
+                DELIVERY_SECONDS.observe(time.perf_counter() - started, outcome="error")
+                error = str(e)
+
+            if attempt == self.max_retries:
+                break
+
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+            logger.warning(f"Webhook delivery failed ({error}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+            self._count("retries")
+            if self._stopping.wait(delay):
+                logger.error(f"Shutting down, abandoning retries for {count} alert(s)")
+                break
+
+        self._count("failed", count)
+        DELIVERY_FAILURES.inc(count, reason="retries_exhausted")
+        logger.error(f"Failed to forward {count} alert(s) to webhook: {error}")
+        return False
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""Group-commit writer and rotated segments for the honeypot alerts NDJSON file"""
+
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from datetime import date, datetime
+
+import honeypot_codec as codec
+from honeypot_metrics import histogram
+
+logger = logging.getLogger(__name__)
+
+FSYNC_POLICIES = ('none', 'interval', 'batch')
+
+APPEND_SECONDS = histogram(
+    'honeypot_alert_file_append_seconds',
+    'Time to append one batch of alerts to the alerts file, including flush and fsync'
+)
+
+def _segment_pattern(path):
+    """Regex matching closed segments (plain or .gz) and their .idx sidecars for path"""
+    stem, ext = os.path.splitext(os.path.basename(path))
+    return re.compile(rf'^{re.escape(stem)}\.(\d{{8}}-\d{{6}}\.\d{{3}})(?:{re.escape(ext)}(\.gz)?|\.idx)$')
+
+def _record_time(record):
+    """Epoch seconds of an alert's timestamp field, or None"""
+    value = record.get('timestamp') if isinstance(record, dict) else None
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return None
+
+def tail_lines(path, count, block_size=65536):
+    """Read the file backwards in blocks and return its last count lines (bytes)
+
+    The cost depends on count, not on the size of the file.
+    """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b''
+        while pos > 0 and data.count(b'\n') <= count:
+            read_size = min(block_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            data = f.read(read_size) + data
+
+    lines = data.splitlines()
+    if pos > 0:
+        # The first line may only be partially read
+        lines = lines[1:]
+    return lines[-count:] if count > 0 else []
+
+def _parse_lines(lines):
+    records = []
+    for line in lines:
+        try:
+            records.append(codec.loads(line))
+        except (codec.DecodeError, UnicodeDecodeError):
+            continue
+    return records
+
+def list_segments(path):
+    """Sidecar index entries of the closed segments of path, oldest first
+
+    Each entry holds the segment file name, record count and the
+    first/last timestamp (epoch seconds) and alert_id range of its records.
+    """
+    directory = os.path.dirname(path) or '.'
+    pattern = _segment_pattern(path)
+    entries = []
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+
+    for name in names:
+        if not name.endswith('.idx') or not pattern.match(name):
+            continue
+        try:
+            with open(os.path.join(directory, name), 'r') as f:
+                entries.append(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.error(f"Unreadable segment index {name}: {e}")
+
+    entries.sort(key=lambda entry: entry['segment'])
+    return entries
+
+def read_segment(path, entry):
+    """Parse every record of a closed segment (compressed or not yet compressed)"""
+    directory = os.path.dirname(path) or '.'
+    segment = os.path.join(directory, entry['segment'])
+    for candidate in (segment, segment[:-3] if segment.endswith('.gz') else segment + '.gz'):
+        if not os.path.exists(candidate):
+            continue
+        opener = gzip.open if candidate.endswith('.gz') else open
+        with opener(candidate, 'rb') as f:
+            return _parse_lines(f.read().splitlines())
+    return []
+
+def read_recent(path, count):
+    """The newest count records across the active file and rotated segments, oldest first
+
+    The active file is tail-read; older segments are only opened when the
+    active file holds fewer than count records, newest segment first.
+    """
+    records = []
+    if os.path.exists(path):
+        records = _parse_lines(tail_lines(path, count))
+
+    if len(records) < count:
+        for entry in reversed(list_segments(path)):
+            missing = count - len(records)
+            records = read_segment(path, entry)[-missing:] + records
+            if len(records) >= count:
+                break
+    return records[-count:] if count > 0 else []
+
+def compressing_log_handler(path, max_bytes=None, backup_count=None):
+    """RotatingFileHandler for service logs whose rotated files are gzip-compressed"""
+    if max_bytes is None:
+        max_bytes = int(os.getenv('HONEYPOT_LOG_MAX_BYTES', str(50 * 1024 * 1024)))
+    if backup_count is None:
+        backup_count = int(os.getenv('HONEYPOT_LOG_BACKUPS', '10'))
+
+    def rotator(source, dest):
+        with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
+
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+    handler.namer = lambda name: name + '.gz'
+    handler.rotator = rotator
+    return handler
+
+class AlertFileWriter:
+    """Single background thread that owns the alerts file
+
+    write() serializes the alert and enqueues the line; the writer thread keeps
+    the file open and appends lines in batches. A batch is flushed once it
+    holds max_batch lines or flush_interval has passed since its first line.
+    The fsync policy makes the cost of durability explicit:
+
+    - none:     leave it to the OS page cache
+    - interval: fsync at most once every fsync_interval seconds
+    - batch:    fsync after every flushed batch
+
+    The active file is rotated once it reaches max_bytes or (with
+    rotate_daily) when the day changes. A rotated segment is gzip-compressed
+    in the background and gets a small .idx sidecar with its record count,
+    timestamp range and alert_id range, so readers can skip straight to the
+    segments they need (see list_segments / read_recent).
+    """
+
+    _STOP = object()
+
+    def __init__(self, path, max_batch=512, flush_interval=0.05, fsync='interval',
+                 fsync_interval=1.0, queue_size=100000, max_bytes=64 * 1024 * 1024,
+                 rotate_daily=True):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync policy must be one of {FSYNC_POLICIES}, got {fsync!r}")
+
+        self.path = path
+        self.max_batch = max(1, max_batch)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = None
+        self.file = None
+        self._last_fsync = time.monotonic()
+        self._dirty = False
+        self._segment = None
+
+    @classmethod
+    def from_env(cls, path):
+        """Build a writer from HONEYPOT_WRITER_* / HONEYPOT_FSYNC* / HONEYPOT_SEGMENT_* variables"""
+        return cls(
+            path,
+            max_batch=int(os.getenv('HONEYPOT_WRITER_BATCH', '512')),
+            flush_interval=int(os.getenv('HONEYPOT_WRITER_FLUSH_MS', '50')) / 1000.0,
+            fsync=os.getenv('HONEYPOT_FSYNC', 'interval').lower(),
+            fsync_interval=float(os.getenv('HONEYPOT_FSYNC_INTERVAL', '1')),
+            max_bytes=int(os.getenv('HONEYPOT_SEGMENT_MAX_BYTES', str(64 * 1024 * 1024))),
+            rotate_daily=os.getenv('HONEYPOT_SEGMENT_ROTATE_DAILY', '1') == '1'
+        )
+
+    def start(self):
+        """Start the writer thread"""
+        self._recover_segments()
+        self.thread = threading.Thread(target=self._run, name="alert-writer", daemon=True)
+        self.thread.start()
+        return self
+
+    def write(self, alert_data):
+        """Queue one alert; returns False if the queue is full and the line was dropped"""
+        item = (codec.dumps_text(alert_data) + '\n', _record_time(alert_data) or time.time(), alert_data.get('alert_id'))
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except queue.Full:
+            logger.error("Alert writer queue is full, alert not saved to file")
+            return False
+
+    def stop(self, timeout=5):
+        """Write out everything queued, fsync and close the file"""
+        if self.thread is None:
+            return
+        try:
+            self.queue.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            logger.error("Alert writer queue still full on shutdown")
+            return
+        self.thread.join(timeout)
+
+    def _new_segment_stats(self):
+        return {"count": 0, "first_ts": None, "last_ts": None, "first_id": None, "last_id": None,
+                "day": date.today().isoformat()}
+
+    def _scan_active(self):
+        """Rebuild the active file's segment stats from its first and last lines"""
+        stats = self._new_segment_stats()
+        try:
+            with open(self.path, 'rb') as f:
+                first = f.readline()
+                f.seek(0)
+                stats["count"] = sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b''))
+            last = tail_lines(self.path, 1)
+        except OSError:
+            return stats
+
+        for key, lines in (("first", [first]), ("last", last)):
+            records = _parse_lines(lines)
+            if records:
+                stats[f"{key}_ts"] = _record_time(records[0])
+                stats[f"{key}_id"] = records[0].get('alert_id')
+        if stats["first_ts"]:
+            stats["day"] = date.fromtimestamp(stats["first_ts"]).isoformat()
+        return stats
+
+    def _open(self):
+        if self.file is None:
+            if self._segment is None:
+                self._segment = self._scan_active() if os.path.exists(self.path) else self._new_segment_stats()
+            self.file = open(self.path, 'a', encoding='utf-8')
+        return self.file
+
+    def _sync(self, force=False):
+        """Apply the fsync policy after a flush (or on shutdown when force is set)"""
+        if not self._dirty or (self.fsync == 'none' and not force):
+            return
+        now = time.monotonic()
+        if force or self.fsync == 'batch' or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self.file.fileno())
+            self._last_fsync = now
+            self._dirty = False
+
+    def _write_batch(self, items):
+        started = time.perf_counter()
+        try:
+            f = self._open()
+            if (self.rotate_daily and self._segment["count"]
+                    and self._segment["day"] != date.today().isoformat()):
+                self._rotate()
+                f = self._open()
+
+            f.write(''.join(line for line, _, _ in items))
+            f.flush()
+            self._dirty = True
+            self._track(items)
+            self._sync()
+            APPEND_SECONDS.observe(time.perf_counter() - started)
+
+            if self.max_bytes and f.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError as e:
+            logger.error(f"Failed to save {len(items)} alert(s) to file: {e}")
+            self._close()
+
+    def _track(self, items, stats=None):
+        """Fold a written batch into stats (the active segment's by default)"""
+        if stats is None:
+            stats = self._segment
+        for _, ts, alert_id in items:
+            if stats["first_ts"] is None:
+                stats["first_ts"] = ts
+            stats["last_ts"] = ts
+            if alert_id is not None:
+                if stats["first_id"] is None:
+                    stats["first_id"] = alert_id
+                stats["last_id"] = alert_id
+        stats["count"] += len(items)
+
+    def _segment_name(self):
+        directory = os.path.dirname(self.path) or '.'
+        stem, ext = os.path.splitext(os.path.basename(self.path))
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        for n in range(1000):
+            base = f"{stem}.{stamp}.{n:03d}"
+            if not any(os.path.exists(os.path.join(directory, base + suffix))
+                       for suffix in (ext, ext + '.gz', '.idx')):
+                return directory, base, ext
+        raise OSError(f"Too many segments rotated at {stamp}")
+
+    def _rotate(self):
+        """Close the active file, move it aside as a segment and compress it in the background"""
+        self._close()
+        directory, base, ext = self._segment_name()
+        segment = os.path.join(directory, base + ext)
+        os.replace(self.path, segment)
+
+        stats = self._segment
+        self._segment = self._new_segment_stats()
+        logger.info(f"Rotated alerts file to {segment} ({stats['count']} alerts)")
+
+        threading.Thread(target=self._compress_segment, args=(segment, stats), daemon=True).start()
+
+    def _write_index(self, segment, stats):
+        """Write the .idx sidecar for a segment atomically"""
+        plain = segment[:-3] if segment.endswith('.gz') else segment
+        index = {"segment": os.path.basename(segment)}
+        index.update({key: value for key, value in stats.items() if key != "day"})
+        index_path = os.path.splitext(plain)[0] + '.idx'
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+
+    def _compress_segment(self, segment, stats):
+        """gzip a rotated segment, then point its sidecar at the compressed file"""
+        try:
+            # Publish the index right away so readers can find the plain segment meanwhile
+            self._write_index(segment, stats)
+            tmp_path = segment + '.gz.tmp'
+            with open(segment, 'rb') as f_in, gzip.open(tmp_path, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out)
+            os.replace(tmp_path, segment + '.gz')
+            self._write_index(segment + '.gz', stats)
+            os.remove(segment)
+        except OSError as e:
+            logger.error(f"Failed to compress alert segment {segment}: {e}")
+
+    def _recover_segments(self):
+        """Finish compressing segments left behind by a crash mid-rotation"""
+        directory = os.path.dirname(self.path) or '.'
+        pattern = _segment_pattern(self.path)
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return
+
+        for name in names:
+            match = pattern.match(name)
+            if not match or name.endswith(('.gz', '.idx')):
+                continue
+            segment = os.path.join(directory, name)
+            if os.path.exists(segment + '.gz'):
+                os.remove(segment + '.gz')
+            records = read_segment(self.path, {"segment": name})
+            stats = self._new_segment_stats()
+            self._track([(None, _record_time(r) or os.path.getmtime(segment), r.get('alert_id')) for r in records],
+                        stats)
+            threading.Thread(target=self._compress_segment, args=(segment, stats), daemon=True).start()
+
+    def _close(self):
+        if self.file is not None:
+            try:
+                self._sync(force=True)
+                self.file.close()
+            except OSError as e:
+                logger.error(f"Failed to close alerts file: {e}")
+            self.file = None
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                first = self.queue.get(timeout=self.fsync_interval)
+            except queue.Empty:
+                # Idle: make sure the tail of the last burst reaches disk
+                if self.file is not None and self.fsync == 'interval':
+                    self._sync()
+                continue
+
+            if first is self._STOP:
+                break
+
+            items = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(items) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stopping = True
+                    break
+                items.append(item)
+
+            self._write_batch(items)
+
+        self._close()
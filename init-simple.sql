@@ -8,6 +8,7 @@ CREATE OR REPLACE FUNCTION log_honeypot_access()
 RETURNS TRIGGER AS $$
 DECLARE
     alert_json TEXT;
+    alert_id INTEGER;
     user_name TEXT := current_user;
     client_addr TEXT := inet_client_addr()::TEXT;
     timestamp_str TEXT := NOW()::TEXT;
@@ -29,7 +30,11 @@ BEGIN
     
     -- Store in a log table
     INSERT INTO honeypot_alerts (alert_data, created_at)
-    VALUES (alert_json::JSON, NOW());
+    VALUES (alert_json::JSON, NOW())
+    RETURNING id INTO alert_id;
+    
+    -- Wake up LISTENing monitors (delivered on commit)
+    PERFORM pg_notify('honeypot_alerts', alert_id::TEXT);
     
     RETURN NULL; -- Don't block the query
 END;
@@ -84,6 +89,7 @@ CREATE OR REPLACE FUNCTION log_honeypot_access_function(table_name TEXT)
 RETURNS TEXT AS $$
 DECLARE
     alert_json TEXT;
+    alert_id INTEGER;
     user_name TEXT := current_user;
     client_addr TEXT := inet_client_addr()::TEXT;
     timestamp_str TEXT := NOW()::TEXT;
@@ -103,7 +109,11 @@ BEGIN
     -- Store in log table (with error handling)
     BEGIN
         INSERT INTO honeypot_alerts (alert_data, created_at)
-        VALUES (alert_json::JSON, NOW());
+        VALUES (alert_json::JSON, NOW())
+        RETURNING id INTO alert_id;
+        
+        -- Wake up LISTENing monitors (delivered on commit)
+        PERFORM pg_notify('honeypot_alerts', alert_id::TEXT);
     EXCEPTION WHEN OTHERS THEN
         -- If insert fails, just log it
         RAISE WARNING 'Failed to insert honeypot alert: %', SQLERRM;
@@ -135,6 +145,20 @@ GRANT SELECT ON honeypot_customer_view, honeypot_financial_view, honeypot_employ
 GRANT SELECT ON honeypot_alerts TO honeypot_test;
 GRANT INSERT ON honeypot_alerts TO honeypot_test;
 
+-- Notify the monitor when honeypot tables or views change, so its catalog cache is refreshed
+CREATE OR REPLACE FUNCTION notify_honeypot_catalog()
+RETURNS event_trigger AS $$
+BEGIN
+    PERFORM pg_notify('honeypot_catalog', tg_tag);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE EVENT TRIGGER honeypot_catalog_changed
+    ON ddl_command_end
+    WHEN TAG IN ('CREATE TABLE', 'CREATE TABLE AS', 'ALTER TABLE', 'DROP TABLE',
+                 'CREATE VIEW', 'ALTER VIEW', 'DROP VIEW')
+    EXECUTE FUNCTION notify_honeypot_catalog();
+
 -- Log setup completion
 DO $$
 BEGIN
@@ -0,0 +1,80 @@
+import os
+import sys
+
+import psycopg2
+import psycopg2.extensions
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from honeypot_monitor import PgConnectionPool
+
+# Tests that need a PostgreSQL server run only when this DSN is set
+TEST_DSN = os.getenv('HONEYPOT_TEST_DSN')
+
+
+class RecordingCursor:
+    """Cursor stand-in that records statements and fails EXECUTE on demand"""
+
+    def __init__(self):
+        self.statements = []
+        self.fail_execute = False
+
+    def execute(self, sql, args=None):
+        self.statements.append(sql)
+        if self.fail_execute and sql.startswith('EXECUTE'):
+            raise psycopg2.ProgrammingError("relation does not exist")
+
+
+def test_execute_prepared_with_psycopg2_connection_object():
+    """psycopg2 connections take no attributes: statements are tracked by the pool"""
+    # A real (unconnected) psycopg2 connection object, which has no instance __dict__
+    conn = psycopg2.extensions.connection.__new__(psycopg2.extensions.connection)
+    pool = PgConnectionPool('dbname=unused')
+    cur = RecordingCursor()
+    sql = "SELECT * FROM t LIMIT %s"
+
+    pool.execute_prepared(conn, cur, sql, (5,))
+    pool.execute_prepared(conn, cur, sql, (10,))
+    prepares = [s for s in cur.statements if s.startswith('PREPARE')]
+    assert len(prepares) == 1
+    assert prepares[0].endswith("AS SELECT * FROM t LIMIT $1")
+
+    # A failed EXECUTE drops the statement and queues it for DEALLOCATE
+    statement = pool._statements[id(conn)][sql]
+    cur.fail_execute = True
+    with pytest.raises(psycopg2.ProgrammingError):
+        pool.execute_prepared(conn, cur, sql, (5,))
+    assert sql not in pool._statements[id(conn)]
+    assert pool._stale_statements[id(conn)] == [statement]
+
+    pool._forget(conn)
+    assert id(conn) not in pool._statements
+    assert id(conn) not in pool._stale_statements
+
+
+@pytest.mark.skipif(not TEST_DSN, reason="HONEYPOT_TEST_DSN not set")
+def test_execute_prepared_deallocates_failed_statement():
+    """On a live server a statement whose EXECUTE failed is deallocated when the connection is returned"""
+    pool = PgConnectionPool(TEST_DSN, minconn=1, maxconn=1)
+    sql = "SELECT * FROM honeypot_prepared_probe LIMIT %s"
+    try:
+        with pool.connection() as conn, conn.cursor() as cur:
+            cur.execute("CREATE TABLE honeypot_prepared_probe (id int)")
+            conn.commit()
+            pool.execute_prepared(conn, cur, sql, (1,))
+            pool.execute_prepared(conn, cur, sql, (1,))
+            assert len(pool._statements[id(conn)]) == 1
+            cur.execute("DROP TABLE honeypot_prepared_probe")
+            conn.commit()
+            with pytest.raises(psycopg2.Error):
+                pool.execute_prepared(conn, cur, sql, (1,))
+
+        with pool.connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT count(*) FROM pg_prepared_statements WHERE name LIKE 'honeypot_stmt_%'")
+            assert cur.fetchone()[0] == 0
+    finally:
+        with pool.connection() as conn, conn.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS honeypot_prepared_probe")
+            conn.commit()
+        pool.close()
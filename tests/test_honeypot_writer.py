@@ -0,0 +1,39 @@
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from honeypot_writer import AlertFileWriter, list_segments, read_recent
+
+
+def test_start_recovers_uncompressed_segment(tmp_path):
+    """A segment left uncompressed by a crash mid-rotation is indexed and compressed on start"""
+    path = str(tmp_path / 'alerts.json')
+    segment = tmp_path / 'alerts.20260101-000000.000.json'
+    records = [
+        {"alert_id": 1, "table": "t", "timestamp": "2026-01-01T00:00:00"},
+        {"alert_id": 2, "table": "t", "timestamp": "2026-01-01T00:00:05"},
+    ]
+    segment.write_text(''.join(json.dumps(r) + '\n' for r in records))
+
+    writer = AlertFileWriter(path).start()
+    try:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            entries = list_segments(path)
+            if entries and entries[0]["segment"].endswith('.gz') and not segment.exists():
+                break
+            time.sleep(0.05)
+    finally:
+        writer.stop()
+
+    assert len(entries) == 1
+    entry = entries[0]
+    assert entry["segment"] == 'alerts.20260101-000000.000.json.gz'
+    assert entry["count"] == 2
+    assert (entry["first_id"], entry["last_id"]) == (1, 2)
+    assert entry["last_ts"] - entry["first_ts"] == 5
+    assert not segment.exists()
+    assert [r["alert_id"] for r in read_recent(path, 10)] == [1, 2]